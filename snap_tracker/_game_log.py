@@ -1,4 +1,6 @@
+import asyncio
 import enum
+import io
 import logging
 import pathlib
 import re
@@ -7,16 +9,15 @@ from typing import (
     Any,
     Generator,
     Iterable,
+    NamedTuple,
 )
 
-import aiopath
-
 CARD_STAGING_RE = re.compile(
     r'StageCard'
     r'\|CardDefId=(?P<card_def_id>\w+)'
     r'\|CardEntityId=(?P<card_eid>\d+)'
     r'\|ZoneEntityId=(?P<zone_eid>\d+)'
-    r'\|Turn=(?P<turn>\d)',
+    r'\|Turn=(?P<turn>\d+)',
 )
 MATCH_FOUND_RE = re.compile(
     r'OnMatchmakingMatchFound'
@@ -35,6 +36,7 @@ GAME_INITIALIZING_RE = re.compile(
     r'\|sceneToLoadAfterGame=Play',
 )
 TURN_END_RE = re.compile(r'EndTurn\|Turn=(?P<turn>[1-7])')
+_NAMED_GROUP_RE = re.compile(r'\(\?P<\w+>')
 
 logger = logging.getLogger(__name__)
 
@@ -49,7 +51,44 @@ class GameLogEvent:
         TURN_END = enum.auto()
 
     type: Type
-    data: dict[str, Any] | None = None
+    data: tuple[Any, ...] | None = None
+
+
+_EVENT_PATTERNS = {
+    GameLogEvent.Type.GAME_END: GAME_RESULTS_ACKED,
+    GameLogEvent.Type.GAME_START: MATCH_FOUND_RE,
+    GameLogEvent.Type.CARD_STAGED: CARD_STAGING_RE,
+    GameLogEvent.Type.TURN_END: TURN_END_RE,
+    GameLogEvent.Type.GAME_INITIALIZING: GAME_INITIALIZING_RE,
+}
+
+
+def _combine_patterns(patterns):
+    """
+    Compile the event patterns into a single alternation anchored at line starts, so that a whole chunk of log
+    can be scanned in one pass.
+
+    Group names repeat between the patterns (e.g. turn), so the inner groups are made positional. The
+    returned index maps the outer group of each alternative to its event type, a named tuple type for the
+    event data and the positions of the data fields in the combined pattern.
+    """
+    alternatives = []
+    groups = {}
+    offset = 0
+    for event_type, pattern in patterns.items():
+        alternatives.append(f'({_NAMED_GROUP_RE.sub("(", pattern.pattern)})')
+        names = sorted(pattern.groupindex, key=pattern.groupindex.get)
+        data_type_name = f'{event_type.name.title().replace("_", "")}Data'
+        groups[offset + 1] = (
+            event_type,
+            NamedTuple(data_type_name, [(name, str) for name in names]) if names else None,
+            [offset + 1 + pattern.groupindex[name] for name in names],
+        )
+        offset += 1 + pattern.groups
+    return re.compile(f'^(?:{"|".join(alternatives)})', re.MULTILINE | re.ASCII), groups
+
+
+_LOG_EVENT_RE, _LOG_EVENT_GROUPS = _combine_patterns(_EVENT_PATTERNS)
 
 
 @dataclass
@@ -62,39 +101,45 @@ class GameLogFileState:
         return cls(path=path, pos=path.stat().st_size)
 
 
-async def _read_log(log_state):
-    async with aiopath.Path(log_state.path).open('r') as f:
-        await f.seek(log_state.pos)
-        lines = await f.readlines()
-        new_pos = await f.tell()
-        logger.debug(
-            'Read %d lines (%d bytes) from %s',
-            len(lines),
-            new_pos - log_state.pos,
-            log_state.path.name,
-        )
-        log_state.pos = new_pos
-    return lines
+def _read_new_bytes(path: pathlib.Path, pos: int) -> tuple[int, bytes]:
+    with path.open('rb') as f:
+        if f.seek(0, io.SEEK_END) < pos:
+            # The game truncates or recreates the log when it restarts.
+            logger.debug('%s was truncated, reading from the start', path.name)
+            pos = 0
+        f.seek(pos)
+        return pos, f.read()
 
 
-def _parse_log_lines(log_lines: Iterable[str]) -> Generator[GameLogEvent, None, None]:
-    for line in log_lines:
-        try:
-            event = _parse_line(line)
-            yield event
-        except LookupError:
-            continue
+async def _read_log(log_state) -> str:
+    pos, data = await asyncio.to_thread(_read_new_bytes, log_state.path, log_state.pos)
+    # A partially written last line is left for the next read.
+    end = data.rfind(b'\n') + 1
+    text = data[:end].decode(errors='replace')
+    logger.debug(
+        'Read %d lines (%d bytes) from %s',
+        text.count('\n'),
+        end,
+        log_state.path.name,
+    )
+    log_state.pos = pos + end
+    return text
+
+
+def _parse_log_lines(log_lines: str | Iterable[str]) -> Generator[GameLogEvent, None, None]:
+    log = log_lines if isinstance(log_lines, str) else '\n'.join(log_lines)
+    for m in _LOG_EVENT_RE.finditer(log):
+        yield _event_from_match(m)
 
 
 def _parse_line(line: str) -> GameLogEvent:
-    if GAME_RESULTS_ACKED.match(line):
-        return GameLogEvent(GameLogEvent.Type.GAME_END)
-    if m := MATCH_FOUND_RE.match(line):
-        return GameLogEvent(GameLogEvent.Type.GAME_START, m.groupdict())
-    if m := CARD_STAGING_RE.match(line):
-        return GameLogEvent(GameLogEvent.Type.CARD_STAGED, m.groupdict())
-    if m := TURN_END_RE.match(line):
-        return GameLogEvent(GameLogEvent.Type.TURN_END, m.groupdict())
-    if m := GAME_INITIALIZING_RE.match(line):
-        return GameLogEvent(GameLogEvent.Type.GAME_INITIALIZING, m.groupdict())
+    if m := _LOG_EVENT_RE.match(line):
+        return _event_from_match(m)
     raise LookupError
+
+
+def _event_from_match(m: re.Match) -> GameLogEvent:
+    event_type, data_type, indices = _LOG_EVENT_GROUPS[m.lastindex]
+    if data_type is None:
+        return GameLogEvent(event_type)
+    return GameLogEvent(event_type, data_type._make(map(m.__getitem__, indices)))
@@ -1,17 +1,18 @@
 import asyncio
+import contextlib
 import datetime
 import hashlib
-import json
+import itertools
 import logging
 import os
-import uuid
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
 import motor.motor_asyncio
+import orjson
 import platformdirs
-from aiopath import AsyncPath
+from pymongo import UpdateOne
 from rich.table import Table
 from watchfiles import awatch
 
@@ -27,19 +28,26 @@ from snap_tracker.data_types import (
     Game,
     PRICE_TO_INFINITY,
     Rarity,
+    _uuid_from_hex,
 )
 from snap_tracker.debug import _replace_dollars_with_underscores_in_keys
 from snap_tracker.helpers import (
+    _decode_json,
+    _read_bytes,
     _read_file,
+    _read_files,
     ensure_account,
     ensure_collection,
     rich_table,
-    write_volume_caches,
+    write_volume_cache,
 )
 
 APP_NAME = 'snap-tracker'
 AUTHOR = 'kimvais'
 FILESYSTEM_SYNC_INTERVAL = 5  # Seconds
+FILESYSTEM_IDLE_SYNC_INTERVAL = 30  # Seconds
+SYNC_BATCH_SIZE = 500  # Documents per bulk_write
+SYNC_READ_CONCURRENCY = 16  # Files read in parallel
 GAME_DATA_DIRECTORY = r'%LOCALAPPDATA%low\Second Dinner\SNAP'
 logger = logging.getLogger(__name__)
 
@@ -47,18 +55,29 @@ logger = logging.getLogger(__name__)
 @dataclass
 class GameStateFile:
     path: Path
-    sha2: str
+    # Fingerprint of the last saved snapshot (the encoded game state), None until the first change is seen.
+    sha2: str | None = None
 
-    @classmethod
-    def from_path(cls, path: Path):
-        with path.open('rb') as f:
-            sha2 = hashlib.sha256(f.read()).hexdigest()
-        return cls(path, sha2)
+
+def _fingerprint(data: bytes) -> str:
+    # Only used to detect changes, OpenSSL's SHA-256 is hardware accelerated where available.
+    return hashlib.sha256(data, usedforsecurity=False).hexdigest()
+
+
+def _encode_and_hash(state):
+    contents = orjson.dumps(state)
+    return contents, _fingerprint(contents)
+
+
+def _parse_game_state(contents: bytes):
+    state = _decode_json(contents)['RemoteGame']['GameState']
+    # Snapshots are compared by the hash of the encoded state, not of the whole file.
+    return state, *_encode_and_hash(state)
 
 
 def get_game_id(state):
     try:
-        return uuid.UUID(hex=state.get('Id'))
+        return _uuid_from_hex(state.get('Id'))
     except TypeError:
         return None
 
@@ -70,18 +89,35 @@ class Tracker:
         self.ongoing_game: Game | None = None
         self.collection: Collection | None = None
         self._profile: dict[str, Any] | None = None
+        # Modification times of the state files the profile and the collection were loaded from.
+        self._profile_mtime: int | None = None
+        self._collection_mtime: tuple[int, int] | None = None
+        # (sha2 of GameState.json, parsed game state, encoded game state, sha2 of the encoded game state)
+        self._state_cache: tuple[str, dict[str, Any], bytes, str] | None = None
 
         dir_fn = os.path.expandvars(GAME_DATA_DIRECTORY)
         self.data_dir: Path = Path(dir_fn)
         self.state_dir: Path = self.data_dir / 'Standalone' / 'States' / 'nvprod'
-        self.error_log = GameLogFileState.from_path(self.data_dir / 'ErrorLog.txt')
-        self.player_log = GameLogFileState.from_path(self.data_dir / 'Player.log')
+        self.error_log: GameLogFileState | None = None
+        self.player_log: GameLogFileState | None = None
+        self._game_logs: dict[str, GameLogFileState] = {}
+        self._fs_dirty = asyncio.Event()
+        self._log_handlers = {
+            GameLogEvent.Type.GAME_START: self._on_game_start,
+            GameLogEvent.Type.TURN_END: self._on_turn_end,
+            GameLogEvent.Type.GAME_END: self._on_game_end,
+            GameLogEvent.Type.CARD_STAGED: self._on_card_staged,
+        }
         self.cache_dir: Path = Path(platformdirs.user_cache_dir(APP_NAME, AUTHOR))
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
-        self.game_state = GameStateFile.from_path(self.state_dir / 'GameState.json')
+        self.game_state = GameStateFile(self.state_dir / 'GameState.json')
 
         try:
-            self._client = motor.motor_asyncio.AsyncIOMotorClient(os.environ['MONGODB_URI'])
+            self._client = motor.motor_asyncio.AsyncIOMotorClient(
+                os.environ['MONGODB_URI'],
+                maxPoolSize=32,
+                minPoolSize=4,
+                compressors='zlib',
+            )
             self.db = self._client.raw
         except KeyError:
             logger.exception("No MONGODB_URI set, syncing will not work.")
@@ -113,16 +149,27 @@ class Tracker:
     @ensure_collection
     async def sync(self):
         logging.info('Using game data directory %s', self.state_dir)
-        for fn in self.state_dir.glob('*.json'):
-            data = await _read_file(fn)
-            query = {
-                '_id': fn.stem,
-            }
-            update = {
-                '$set': _replace_dollars_with_underscores_in_keys(data),
-            }
-            result = await self.db.game_files.update_one(query, update, upsert=True)
-            logger.info(result)
+        files = list(self.state_dir.glob('*.json'))
+        # Connect to the database while the state files are being read.
+        contents, _ = await asyncio.gather(
+            _read_files(files, SYNC_READ_CONCURRENCY),
+            self._client.admin.command('ping'),
+        )
+        documents = await asyncio.gather(
+            *(asyncio.to_thread(_replace_dollars_with_underscores_in_keys, data) for data in contents),
+        )
+        pairs = zip((fn.stem for fn in files), documents, strict=True)
+        for batch in itertools.batched(pairs, SYNC_BATCH_SIZE):
+            ops = [
+                UpdateOne(
+                    {'_id': stem},
+                    {'$set': data},
+                    upsert=True,
+                )
+                for stem, data in batch
+            ]
+            result = await self.db.game_files.bulk_write(ops, ordered=False)
+            logger.info(result.bulk_api_result)
 
     @ensure_collection
     async def upgrades(self):
@@ -142,7 +189,11 @@ class Tracker:
     # Internals
 
     async def _load_profile(self):
+        mtime = self._state_mtime('Profile')
+        if self._profile is not None and mtime == self._profile_mtime:
+            return
         self._profile = (await self._read_state('Profile'))['ServerState']
+        self._profile_mtime = mtime
 
     @property
     def account(self):
@@ -151,17 +202,33 @@ class Tracker:
         except TypeError:
             logger.exception("Tracker._load_profile() hasn't been awaited!")
 
+    async def _async_setup(self):
+        self.error_log, self.player_log, _ = await asyncio.gather(
+            asyncio.to_thread(GameLogFileState.from_path, self.data_dir / 'ErrorLog.txt'),
+            asyncio.to_thread(GameLogFileState.from_path, self.data_dir / 'Player.log'),
+            asyncio.to_thread(self.cache_dir.mkdir, parents=True, exist_ok=True),
+        )
+        self._game_logs = {'Player': self.player_log, 'ErrorLog': self.error_log}
+
     @ensure_collection
     async def _arun(self):
+        await self._async_setup()
         async with asyncio.TaskGroup() as tg:
             tg.create_task(self._periodic_volume_cache_write())
             tg.create_task(self._watch())
 
     async def _watch(self):
-        paths = (self.player_log.path, self.error_log.path, self.game_state.path)
-        console.log('Watching for file changes in', paths)
+        # Watch the directories rather than the files, so that files replaced on save are not lost.
+        watched_files = {self.player_log.path, self.error_log.path, self.game_state.path}
+        watched_names = {path.name for path in watched_files}
+        paths = {path.parent for path in watched_files}
+        console.log('Watching for file changes in', watched_files)
         try:
-            async for changes in awatch(*paths, force_polling=True):
+            async for changes in awatch(
+                *paths,
+                watch_filter=lambda _change, path: path.rsplit(os.sep, 1)[-1] in watched_names,
+                recursive=False,
+            ):
                 for change in changes:
                     await self._process_change(change)
         except asyncio.CancelledError:
@@ -169,23 +236,51 @@ class Tracker:
         finally:
             await asyncio.sleep(0)
 
+    def _state_mtime(self, name):
+        # A single stat() per decorated call, cheaper inline than a round trip through the thread pool.
+        return (self.state_dir / f'{name}State.json').stat().st_mtime_ns
+
     async def _read_state(self, name):
         file_name = self.state_dir / f'{name}State.json'
         return await _read_file(file_name)
 
     async def parse_game_state(self):
-        data = await self._read_state('Game')
-        return data['RemoteGame']['GameState']
+        contents = await _read_bytes(self.game_state.path)
+        file_sha2 = _fingerprint(contents)
+        if self._state_cache is None or self._state_cache[0] != file_sha2:
+            # Parse off the event loop so the file watcher and log tailing aren't held up.
+            self._state_cache = (file_sha2, *await asyncio.to_thread(_parse_game_state, contents))
+        return self._state_cache[1]
 
     async def _periodic_volume_cache_write(self):
         drive = self.game_state.path.drive
         driveletter = drive[0]
-        await write_volume_caches(FILESYSTEM_SYNC_INTERVAL, driveletter)
+        console.log(
+            'Writing filesystem changes to disk', FILESYSTEM_SYNC_INTERVAL, 'seconds after changes on', driveletter,
+        )
+        try:
+            while True:
+                # Still flush every now and then when idle, the game's writes may not be visible before a flush.
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._fs_dirty.wait(), FILESYSTEM_IDLE_SYNC_INTERVAL)
+                self._fs_dirty.clear()
+                await asyncio.sleep(FILESYSTEM_SYNC_INTERVAL)
+                await write_volume_cache(driveletter)
+        except asyncio.CancelledError:
+            console.log('Shutting down periodic Write-VolumeCache.')
+        finally:
+            console.log("Periodic Write-VolumeCache shut down.")
+            await asyncio.sleep(0)
 
     @ensure_account
     async def _load_collection(self):
+        # Card scores come from the profile, so a newer profile also invalidates the collection.
+        mtime = (self._state_mtime('Collection'), self._profile_mtime)
+        if self.collection is not None and mtime == self._collection_mtime:
+            return
         coll_state = await self._read_state('Collection')
         self.collection = Collection(self.account, coll_state['ServerState'])
+        self._collection_mtime = mtime
 
     def _find_splits(self, credits_, max_rows=20):
         table = []
@@ -215,21 +310,19 @@ class Tracker:
 
     async def _process_change(self, change):
         _change_type, changed_file = change
-        changed_path = Path(changed_file)
-        match changed_path.stem:
-            case 'Player':
-                new_log_lines = await _read_log(self.player_log)
-                await self._handle_log(new_log_lines)
-            case 'ErrorLog':
-                new_log_lines = await _read_log(self.error_log)
-                await self._handle_log(new_log_lines)
-            case 'GameState':
-                await self._handle_game_state_change()
-            case _:
-                console.log('Unknown file change tracked:', changed_path)
-
-    async def _handle_game_state_change(self):
-        state = await self.parse_game_state()
+        self._fs_dirty.set()
+        stem = changed_file.rsplit(os.sep, 1)[-1].split('.', 1)[0]
+        if stem == 'GameState':
+            await self._handle_game_state_change()
+        elif log_state := self._game_logs.get(stem):
+            new_log_lines = await _read_log(log_state)
+            await self._handle_log(new_log_lines)
+        else:
+            console.log('Unknown file change tracked:', changed_file)
+
+    async def _handle_game_state_change(self, state=None):
+        if state is None:
+            state = await self.parse_game_state()
         cgi = state.get('ClientGameInfo')
         if cgi is not None:
             console.log('ClientGameInfo:', cgi)
@@ -280,72 +373,83 @@ class Tracker:
         except (KeyError, ValueError):
             pass
         else:
+            game = self.ongoing_game
             p1info = p1.get('PlayerInfo')
             p2info = p2.get('PlayerInfo')
-            if p1info and p2info:
-                if p1info['AccountId'] == self.account['Id'] and self.ongoing_game.player_idx != 1:
-                    self.ongoing_game.player_idx = 1
-                    console.log('You are player 1')
-                    opponent = p2
-                elif p2info['AccountId'] == self.account['Id'] and self.ongoing_game.player_idx != 2:
-                    self.ongoing_game.player_idx = 2
-                    console.log('You are player 2')
-                    opponent = p1
-                if self.ongoing_game.opponent is None:
-                    self.ongoing_game.opponent = opponent
-                    opp_info = opponent['PlayerInfo']
-                    console.log(':crossed_swords: [red]',
-                                opp_info['Name'],
-                                '[reset]CL:', opp_info['CollectionScore'],
-                                'ATH rank:', opp_info['HighWatermarkRank']
-                                )
-                logger.debug('Player1: %s', p1)
-                logger.debug('Player2: %s', p2)
+            if game is None or not (p1info and p2info):
+                return
+            my_id = self.account['Id']
+            if p1info['AccountId'] == my_id:
+                player_idx, opponent = 1, p2
+            elif p2info['AccountId'] == my_id:
+                player_idx, opponent = 2, p1
+            else:
+                return
+            if game.player_idx != player_idx:
+                game.player_idx = player_idx
+                console.log('You are player', player_idx)
+            if game.opponent is None:
+                game.opponent = opponent
+                opp_info = opponent['PlayerInfo']
+                console.log(':crossed_swords: [red]',
+                            opp_info['Name'],
+                            '[reset]CL:', opp_info['CollectionScore'],
+                            'ATH rank:', opp_info['HighWatermarkRank']
+                            )
+            logger.debug('Player1: %s', p1)
+            logger.debug('Player2: %s', p2)
 
     async def _handle_log(self, new_log_lines):
         state = await self.parse_game_state()
-        staged_turn = 0
-        game_id = get_game_id(state)
-        turn_in_state = state.get('Turn', 0)
+        debug = logger.isEnabledFor(logging.DEBUG)
         for log_event in _parse_log_lines(new_log_lines):
-            logger.debug(log_event)
-            match log_event.type:
-                case GameLogEvent.Type.GAME_START:
-                    game_id = uuid.UUID(hex=log_event.data['game_id'])
-                    self.ongoing_game = Game(game_id)
-                    console.log('Matchmaking found us a game', game_id)
-                    continue
-                case GameLogEvent.Type.TURN_END:
-                    turn = int(log_event.data['turn'])
-                    console.log('Turn', turn, 'ended.')
-                    self._update_current_turn(turn + 1, game_id)
-                    await self._handle_game_state_change()
-                    continue
-                case GameLogEvent.Type.GAME_END:
-                    console.log('Game finished, waiting for state to update.')
-                    break
-                case GameLogEvent.Type.CARD_STAGED:
-                    staged_turn = max((int(log_event.data['turn']), staged_turn))
-                    if turn_in_state < staged_turn:
-                        self._update_current_turn(staged_turn, game_id)
+            if debug:
+                logger.debug('Log event: %s', log_event)
+            handler = self._log_handlers.get(log_event.type)
+            # A handler returns True when the rest of the new log lines should be skipped.
+            if handler is not None and await handler(log_event, state):
+                break
+
+    async def _on_game_start(self, log_event, _state):
+        game_id = _uuid_from_hex(log_event.data.game_id)
+        self.ongoing_game = Game(game_id)
+        console.log('Matchmaking found us a game', game_id)
+
+    async def _on_turn_end(self, log_event, state):
+        turn = int(log_event.data.turn)
+        console.log('Turn', turn, 'ended.')
+        self._update_current_turn(turn + 1, get_game_id(state))
+        await self._handle_game_state_change(state)
+
+    async def _on_game_end(self, _log_event, _state):
+        console.log('Game finished, waiting for state to update.')
+        return True
+
+    async def _on_card_staged(self, log_event, state):
+        staged_turn = int(log_event.data.turn)
+        if state.get('Turn', 0) < staged_turn:
+            self._update_current_turn(staged_turn, get_game_id(state))
 
     async def _save_state_snapshot(self, state, file_name: str | None = None):
         ts = datetime.datetime.now(tz=datetime.UTC)
         fn = file_name if file_name is not None else f'game_state_{ts.strftime("%Y%m%dT%H%M%S%f")}.json'
-        out_path = AsyncPath(self.cache_dir / fn)
-        contents = json.dumps(state)
-        sha2 = hashlib.sha256(contents.encode('utf-8')).hexdigest()
+        out_path = self.cache_dir / fn
+        if self._state_cache is not None and state is self._state_cache[1]:
+            # Already encoded when the state was parsed.
+            _file_sha2, _state, contents, sha2 = self._state_cache
+        else:
+            contents, sha2 = await asyncio.to_thread(_encode_and_hash, state)
         if sha2 == self.game_state.sha2:
             logger.debug('No change in game state.')
             return
         self.game_state.sha2 = sha2
         console.log('State updated', len(contents), 'bytes')
-        async with out_path.open('w+') as f:
-            await f.write(contents)
-            logger.debug('Wrote %d bytes to %s', len(contents), out_path.name)
+        await asyncio.to_thread(out_path.write_bytes, contents)
+        logger.debug('Wrote %d bytes to %s', len(contents), out_path.name)
 
     async def handle_game_result(self, result):
-        grai = next(ai for ai in result['GameResultAccountItems'] if ai['AccountId'] == self.account['Id'])
+        by_account = {ai['AccountId']: ai for ai in result['GameResultAccountItems']}
+        grai = by_account[self.account['Id']]
         is_winner = grai.get('IsWinner', False)
         is_loser = grai.get('IsLoser', False)
         if is_winner == is_loser:
@@ -1,43 +1,31 @@
 import enum
 import itertools
-import operator
 import uuid
+from collections.abc import (
+    Iterable,
+)
+from collections.abc import (
+    Set as AbstractSet,
+)
 from dataclasses import (
     dataclass,
     field,
 )
 from enum import Enum
-from functools import cached_property
+from functools import lru_cache
+from types import MappingProxyType
 
 import stringcase
 
+# stringcase is regex based and the same identifiers repeat across the whole collection.
+_snakecase = lru_cache(maxsize=1024)(stringcase.snakecase)
+_titlecase = lru_cache(maxsize=2048)(stringcase.titlecase)
 
-def _calculate_prices():
-    _total_costs = (
-        (Rarity.COMMON, 0, 0),
-        (Rarity.UNCOMMON, 25, 5),
-        (Rarity.RARE, 125, 15),
-        (Rarity.EPIC, 325, 35),
-        (Rarity.LEGENDARY, 625, 65),
-        (Rarity.ULTRA, 1025, 105),
-        (Rarity.INFINITY, 1525, 155),
-    )
-    ranks = Enum('Rank', [(c[0].value, i) for i, c in enumerate(reversed(_total_costs), 1)])
-    upgrades = itertools.combinations(_total_costs, 2)
-    for pair in upgrades:
-        lower = min(pair, key=operator.itemgetter(1))
-        upper = max(pair, key=operator.itemgetter(1))
-        from_ = lower[0]
-        to = upper[0]
-        credit_cost = upper[1] - lower[1]
-        booster_cost = upper[2] - lower[2]
-        yield Price(
-            from_,
-            to,
-            credit_cost,
-            booster_cost,
-            ranks[to].value,
-        )
+
+@lru_cache(maxsize=32)
+def _uuid_from_hex(hex_: str) -> uuid.UUID:
+    # The same game id is parsed from every state update during a game.
+    return uuid.UUID(hex=hex_)
 
 
 class GameMode(enum.Enum):
@@ -54,15 +42,15 @@ class Game:
 
     @classmethod
     def new(cls, game_id: str, **kwargs):
-        return cls(id=uuid.UUID(hex=game_id), **kwargs)
+        return cls(id=_uuid_from_hex(game_id), **kwargs)
 
     def __eq__(self, other):
         if isinstance(other, Game):
             return self.id == other.id
         if isinstance(other, uuid.UUID):
-            return self.id == Game(other).id
+            return self.id == other
         if isinstance(other, str):
-            return self.id == Game(uuid.UUID(hex=other)).id
+            return self.id == _uuid_from_hex(other)
         raise NotImplementedError
 
 
@@ -90,32 +78,63 @@ class Rarity(str, Enum):
     __repr__ = __str__
 
 
-@dataclass
+_TOTAL_COSTS = (
+    (Rarity.COMMON, 0, 0),
+    (Rarity.UNCOMMON, 25, 5),
+    (Rarity.RARE, 125, 15),
+    (Rarity.EPIC, 325, 35),
+    (Rarity.LEGENDARY, 625, 65),
+    (Rarity.ULTRA, 1025, 105),
+    (Rarity.INFINITY, 1525, 155),
+)
+_Rank = Enum('Rank', [(c[0].value, i) for i, c in enumerate(reversed(_TOTAL_COSTS), 1)])
+
+
+@dataclass(frozen=True, slots=True)
 class Price:
     rarity: Rarity
     target: Rarity
     credits: int
     boosters: int
     _priority: int
+    collection_points: int = field(init=False)
+    _markup: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        quotient, remainder = divmod(self.credits, 50)
+        object.__setattr__(self, 'collection_points', int(quotient + remainder / 25))
+        # Prices are frozen, so the same markup can be reused in every table row.
+        object.__setattr__(self, '_markup', f'{self.rarity} -> {self.target}')
 
     def __rich__(self):
-        return f'{self.rarity} -> {self.target}'
+        return self._markup
 
     @property
     def is_split(self):
         return self.target == Rarity.INFINITY
 
-    @property
-    def collection_points(self):
-        quotient, remainder = divmod(self.credits, 50)
-        return int(quotient + remainder / 25)
-
     def __lt__(self, other):
         return self._priority > other._priority
 
 
-PRICES = sorted(_calculate_prices(), key=lambda price: (price._priority, price.credits))
-PRICE_TO_INFINITY = {price.rarity: price for price in PRICES if price.target == Rarity.INFINITY}
+def _calculate_prices():
+    # _TOTAL_COSTS is in ascending order, so combinations() always yields (lower, upper).
+    for lower, upper in itertools.combinations(_TOTAL_COSTS, 2):
+        from_ = lower[0]
+        to = upper[0]
+        credit_cost = upper[1] - lower[1]
+        booster_cost = upper[2] - lower[2]
+        yield Price(
+            from_,
+            to,
+            credit_cost,
+            booster_cost,
+            _Rank[to].value,
+        )
+
+
+PRICES = tuple(sorted(_calculate_prices(), key=lambda price: (price._priority, price.credits)))
+PRICE_TO_INFINITY = MappingProxyType({price.rarity: price for price in PRICES if price.target == Rarity.INFINITY})
 
 
 class Finish(enum.Enum):
@@ -153,12 +172,12 @@ class Flare:
     def from_def(cls, flare_def_id):
         if flare_def_id is None:
             return None
-        flare_name, *_rem = stringcase.snakecase(flare_def_id).split('_', 1)
+        flare_name, *_rem = _snakecase(flare_def_id).split('_', 1)
         color = cls.Color(_rem[0]) if _rem else None
         return cls(cls.Effect(flare_name), color)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CardVariant:
     variant_id: str
     rarity: Rarity
@@ -168,40 +187,89 @@ class CardVariant:
     is_favourite: bool = False
 
 
-@dataclass
+class _VariantBag(AbstractSet):
+    """
+    The variants of a card. Adding a variant updates the summaries Card reports, so they can't go stale.
+    """
+    __slots__ = ('_variants', 'commons', 'finishes', 'rarities', 'variant_ids')
+
+    def __init__(self, variants: Iterable[CardVariant] = ()):
+        self._variants: set[CardVariant] = set()
+        self.variant_ids: set[str] = set()
+        self.commons = 0
+        self.finishes: set[Finish | None] = set()
+        self.rarities: set[Rarity] = set()
+        for variant in variants:
+            self.add(variant)
+
+    def __contains__(self, variant):
+        return variant in self._variants
+
+    def __iter__(self):
+        return iter(self._variants)
+
+    def __len__(self):
+        return len(self._variants)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._variants!r})'
+
+    def add(self, variant: CardVariant):
+        if variant in self._variants:
+            return
+        self._variants.add(variant)
+        self.variant_ids.add(variant.variant_id)
+        self.commons += variant.rarity == Rarity.COMMON
+        self.finishes.add(variant.finish)
+        self.rarities.add(variant.rarity)
+
+
+@dataclass(slots=True)
 class Card:
     def_id: str
     boosters: int
     splits: int = 0
-    variants: set[CardVariant] = field(default_factory=set)
+    variants: _VariantBag = field(default_factory=_VariantBag)
     score: int = 0
 
-    @cached_property
-    def different_variants(self):
-        return len({v.variant_id for v in self.variants})
+    def __post_init__(self):
+        if not isinstance(self.variants, _VariantBag):
+            self.variants = _VariantBag(self.variants)
 
     @property
     def name(self):
-        return stringcase.titlecase(self.def_id)
+        return _titlecase(self.def_id)
 
-    def __rich__(self):
-        gold = ':yellow_circle:' if self.has_gold else ''
-        ink = ':black_heart:' if self.has_ink else ''
-        return f'{self.name} <{self.splits}{gold}{ink}/{self.different_variants}> ({self.score})'
+    @property
+    def different_variants(self):
+        return len(self.variants.variant_ids)
 
-    @cached_property
+    @property
     def number_of_common_variants(self):
-        return sum(1 for v in self.variants if v.rarity == Rarity.COMMON)
+        return self.variants.commons
 
-    @cached_property
+    @property
     def has_ink(self):
-        return any(v.finish == Finish.INK for v in self.variants)
+        return Finish.INK in self.variants.finishes
 
-    @cached_property
+    @property
     def has_gold(self):
-        return any(v.finish == Finish.GOLD for v in self.variants)
+        return Finish.GOLD in self.variants.finishes
 
-@dataclass
+    @property
+    def rarities(self):
+        return self.variants.rarities
+
+    def __rich__(self):
+        gold = ':yellow_circle:' if self.has_gold else ''
+        ink = ':black_heart:' if self.has_ink else ''
+        return f'{self.name} <{self.splits}{gold}{ink}/{self.different_variants}> ({self.score})'
+
+    def add_variant(self, variant: CardVariant):
+        self.variants.add(variant)
+
+
+@dataclass(slots=True)
 class SplitRate:
     finish: dict[Finish, float]
     flare: dict[Flare.Effect, float]
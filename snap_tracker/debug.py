@@ -4,15 +4,17 @@ logger = logging.getLogger(__name__)
 
 
 def _replace_dollars_with_underscores_in_keys(d):
-    for k, v in d.copy().items():
-        new_key = _get_new_key(k)
-        if isinstance(v, dict):
-            d.pop(k)
-            d[new_key] = v
-            _replace_dollars_with_underscores_in_keys(v)
+    stack = [d]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            # Only allocate new keys for the few that need renaming.
+            for k in [k for k in obj if '$' in k or k == '_id']:
+                obj[_get_new_key(k)] = obj.pop(k)
+            children = obj.values()
         else:
-            d.pop(k)
-            d[new_key] = v
+            children = obj
+        stack.extend(v for v in children if isinstance(v, dict | list))
     return d
 
 
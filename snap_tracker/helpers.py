@@ -1,51 +1,71 @@
 import asyncio
 import codecs
-import json
 import logging
+import math
 import pathlib
 import shutil
 from collections.abc import (
     Iterable,
 )
-from functools import wraps
+from functools import (
+    wraps,
+)
 from typing import (
     Any,
     Awaitable,
     Callable,
 )
 
-import aiofiles
-import stringcase
+import orjson
 from rich.highlighter import ReprHighlighter
 from rich.protocol import is_renderable
 from rich.table import Table
-
-from snap_tracker._console import console
+from rich.text import Text
 
 logger = logging.getLogger(__name__)
 
+_BOM = codecs.BOM_UTF8
 _hl = ReprHighlighter()
 
 
+def _sentencecase(s: str | None) -> str | None:
+    # Column names are snake_case dict keys, no need for stringcase's regex passes.
+    return s.replace('_', ' ').strip().capitalize() if s else s
+
+
+def _styled(text: str, style: str) -> Text:
+    # Style a span like the highlighter does, a base style would also colour the cell padding.
+    styled = Text(text)
+    styled.stylize(style)
+    return styled
+
+
 def hl(obj):
+    # Numbers and booleans are the bulk of the table cells, style them without running the highlighter regexes.
+    type_ = type(obj)
+    if type_ is int or (type_ is float and math.isfinite(obj)):
+        return _styled(str(obj), 'repr.number')
+    if type_ is bool:
+        return _styled(str(obj), 'repr.bool_true' if obj else 'repr.bool_false')
     return _hl(str(obj))
 
 
 def rich_table(data: list[dict[str, Any]], title: str | None = None):
     if not data:
         raise ValueError
-    columns = data[0].keys()
-    table = Table(title=stringcase.sentencecase(title))
-    for column in columns:
-        table.add_column(stringcase.sentencecase(column))
-    for row in data:
-        table.add_row(*((v if is_renderable(v) else hl(v)) for v in row.values()))
+    table = Table(*(_sentencecase(column) for column in data[0]), title=_sentencecase(title))
+    # Every row has the same shape, so decide per column instead of per cell.
+    renderable = [is_renderable(v) for v in data[0].values()]
+    rows = [[v if r else hl(v) for r, v in zip(renderable, row.values(), strict=True)] for row in data]
+    for row in rows:
+        table.add_row(*row)
     return table
 
 
 def ensure_collection(func):
     """
-    A decorator to ensure that self._load_collection() has been awaited.
+    A decorator to ensure that self._load_collection() has been awaited. The collection is only rebuilt when
+    the state files it was loaded from have changed.
     """
     @wraps(func)
     async def wrapper(self, *args, **kwargs):
@@ -64,41 +84,51 @@ def ensure_account(func: Callable[[Any, Any], Awaitable[Any]]) -> Callable[[Any,
     return wrapper
 
 
+async def _read_bytes(fn: pathlib.Path) -> bytes:
+    logger.debug("loading %s", fn.stem)
+    return await asyncio.to_thread(fn.read_bytes)
+
+
+def _decode_json(contents: bytes) -> dict[str, object]:
+    if contents.startswith(_BOM):
+        # Skip the BOM without copying the rest of the file.
+        return orjson.loads(memoryview(contents)[len(_BOM):])
+    return orjson.loads(contents)
+
+
+def _load_json(fn: pathlib.Path) -> dict[str, object]:
+    return _decode_json(fn.read_bytes())
+
+
 async def _read_file(fn: pathlib.Path) -> dict[str, object]:
     logger.debug("loading %s", fn.stem)
-    async with aiofiles.open(fn, 'rb') as f:
-        contents = await f.read()
-        if contents[:3] == codecs.BOM_UTF8:
-            data = contents[3:]
-            payload = json.loads(data.decode())
-        else:
-            raise ValueError(contents[:10])
-        return payload
-
-
-async def write_volume_caches(every: int = 5, driveletter: str = 'C'):
-    console.log('Setting up a task to write filesystem changes to disk every', every, 'seconds on', driveletter)
+    # Read and parse in the same worker thread, the parsed state is all the callers need.
+    return await asyncio.to_thread(_load_json, fn)
+
+
+async def _read_files(paths: Iterable[pathlib.Path], concurrency: int = 32) -> list[dict[str, object]]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _read_one(fn):
+        async with semaphore:
+            return await _read_file(fn)
+
+    return await asyncio.gather(*(_read_one(fn) for fn in paths))
+
+
+async def write_volume_cache(driveletter: str = 'C'):
     powershell = shutil.which('pwsh.exe')
     command = f'Start-Job -ScriptBlock {{Write-VolumeCache {driveletter}}}'
-    process = None
+    process = await asyncio.subprocess.create_subprocess_exec(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        executable=powershell,
+    )
     try:
-        while True:
-            process = await asyncio.subprocess.create_subprocess_exec(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                executable=powershell,
-            )
-            await process.communicate()
-            logger.debug('Write-VolumeCache %s called, sleeping %d seconds', (driveletter, every))
-            await asyncio.sleep(every)
+        await process.communicate()
     except asyncio.CancelledError:
-        console.log('Shutting down periodic Write-VolumeCache.')
-        try:
-            process.terminate()
-            await process.wait()
-        except AttributeError:
-            pass
-    finally:
-        console.log("Periodic Write-VolumeCache shut down.")
-        await asyncio.sleep(0)
+        process.terminate()
+        await process.wait()
+        raise
+    logger.debug('Write-VolumeCache %s called', driveletter)
@@ -0,0 +1,57 @@
+import unittest
+
+from snap_tracker.collection import Collection
+from snap_tracker.data_types import Rarity
+
+ACCOUNT = {'CardStats': {'$type': 'CardStats', 'Abomination': 12, 'Hulk': 3}}
+SERVER_STATE = {
+    'CardDefStats': {
+        'Stats': {
+            '$type': 'Stats',
+            'Abomination': {'Boosters': 10},
+            'Hulk': {'Boosters': 40, 'InfinitySplitCount': 2},
+        },
+    },
+    'Cards': [
+        {'CardDefId': 'Abomination', 'RarityDefId': 'Common'},
+        {'CardDefId': 'Hulk', 'RarityDefId': 'Common'},
+        {'CardDefId': 'Hulk', 'RarityDefId': 'Rare', 'ArtVariantDefId': 'Hulk_01', 'SurfaceEffectDefId': 'GoldEffect'},
+        {'CardDefId': 'Hulk', 'RarityDefId': 'Epic', 'Custom': True},
+    ],
+}
+
+
+def _collection():
+    return Collection(ACCOUNT, SERVER_STATE)
+
+
+class CollectionTest(unittest.TestCase):
+    def test_mapping(self):
+        collection = _collection()
+        assert 'Hulk' in collection
+        assert 'Deadpool' not in collection
+        assert list(collection) == ['Abomination', 'Hulk']
+        assert len(collection) == 2
+        assert collection['Hulk'].score == 3
+        assert collection['Hulk'].has_gold
+
+    def test_by_rarity(self):
+        collection = _collection()
+        assert collection._by_rarity == {
+            Rarity.COMMON: [collection['Abomination'], collection['Hulk']],
+            Rarity.RARE: [collection['Hulk']],
+        }
+
+    def test_maximize_level_without_credits(self):
+        # Less than one upgrade's worth of credits gives no rows rather than 0x upgrades.
+        assert _collection()._maximize_level(20) == []
+
+    def test_maximize_level(self):
+        rows = _collection()._maximize_level(30)
+        assert [(row['x'], row['card'], row['credits_']) for row in rows] == [(1, 'Hulk', '5 (-25)')]
+        rows = _collection()._maximize_level(50)
+        assert [(row['x'], row['card']) for row in rows] == [(1, 'Hulk'), (1, 'Abomination')]
+
+
+if __name__ == '__main__':
+    unittest.main()
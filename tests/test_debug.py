@@ -0,0 +1,25 @@
+import unittest
+
+from snap_tracker.debug import _replace_dollars_with_underscores_in_keys
+
+
+class DebugTest(unittest.TestCase):
+    def test_replace_dollars(self):
+        data = {
+            '$type': 'GameState',
+            '_id': 1,
+            'Players': [{'$id': 2, 'Cards': [{'$ref': 3}]}],
+            'Nested': {'$values': {'$ref': 4}},
+        }
+        result = _replace_dollars_with_underscores_in_keys(data)
+        assert result is data
+        assert data == {
+            '_type': 'GameState',
+            'id_': 1,
+            'Players': [{'id_': 2, 'Cards': [{'_ref': 3}]}],
+            'Nested': {'_values': {'_ref': 4}},
+        }
+
+
+if __name__ == '__main__':
+    unittest.main()
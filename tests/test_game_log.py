@@ -1,10 +1,13 @@
 import pathlib
+import tempfile
 import unittest
 
 from snap_tracker._game_log import (
     GameLogEvent,
+    GameLogFileState,
     _parse_line,
     _parse_log_lines,
+    _read_log,
 )
 from snap_tracker.data_types import GameMode
 
@@ -14,7 +17,7 @@ class GameLogTest(unittest.TestCase):
         line = r'OnMatchmakingMatchFound|GameId=60c106af-c97f-445b-8840-d6433be947f9|GameHostUrl=wss://eu-central-1-ws-cf.nvprod.snapgametech.com/v33.16-7-game'
         event = _parse_line(line)
         assert event.type == GameLogEvent.Type.GAME_START
-        assert event.data['game_id']
+        assert event.data.game_id
 
     def test_game_result_ack(self):
         line = r'RemoteGame|SendRequestObject|RequestType=CubeGame.AckGameResultRequest'
@@ -25,21 +28,21 @@ class GameLogTest(unittest.TestCase):
         line = r'EndTurn|Turn=3'
         event = _parse_line(line)
         assert event.type == GameLogEvent.Type.TURN_END
-        assert int(event.data['turn']) == 3
+        assert int(event.data.turn) == 3
 
     def test_card_staging(self):
         line = r'StageCard|CardDefId=Deadpool|CardEntityId=62|ZoneEntityId=11|Turn=6'
         event = _parse_line(line)
         assert event.type == GameLogEvent.Type.CARD_STAGED
-        assert event.data['card_def_id'] == 'Deadpool'
-        assert int(event.data['zone_eid']) == 11
-        assert int(event.data['turn']) == 6
+        assert event.data.card_def_id == 'Deadpool'
+        assert int(event.data.zone_eid) == 11
+        assert int(event.data.turn) == 6
 
     def test_game_initializing(self):
         line = r'GameManager|Initialize|gameMode=Remote|leagueDefId=Ranked|sceneToLoadAfterGame=Play'
         event = _parse_line(line)
         assert event.type == GameLogEvent.Type.GAME_INITIALIZING
-        assert GameMode(event.data['game_mode']) == GameMode.RANKED
+        assert GameMode(event.data.game_mode) == GameMode.RANKED
 
     def test_sample_log(self):
         log = pathlib.Path(__file__).parent / 'test_data' / 'Player.log'
@@ -50,4 +53,30 @@ class GameLogTest(unittest.TestCase):
             assert events[-1].type == GameLogEvent.Type.GAME_END
             other_events = events[2:-1]
             turn_end_events = [ev for ev in other_events if ev.type == GameLogEvent.Type.TURN_END]
-            assert [int(ev.data['turn']) for ev in turn_end_events] == list(range(1, 7))
+            assert [int(ev.data.turn) for ev in turn_end_events] == list(range(1, 7))
+
+
+class ReadLogTest(unittest.IsolatedAsyncioTestCase):
+    async def test_tail_and_truncation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = pathlib.Path(tmp) / 'Player.log'
+            log.write_text('EndTurn|Turn=1\n')
+            log_state = GameLogFileState.from_path(log)
+            with log.open('a') as f:
+                f.write('EndTurn|Turn=2\n')
+            assert await _read_log(log_state) == 'EndTurn|Turn=2\n'
+            assert await _read_log(log_state) == ''
+            log.write_text('EndTurn|Turn=3\n')
+            assert await _read_log(log_state) == 'EndTurn|Turn=3\n'
+
+    async def test_partial_line(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = pathlib.Path(tmp) / 'Player.log'
+            log.write_text('')
+            log_state = GameLogFileState.from_path(log)
+            with log.open('a') as f:
+                f.write('EndTurn|Turn=1\nEndTu')
+            assert await _read_log(log_state) == 'EndTurn|Turn=1\n'
+            with log.open('a') as f:
+                f.write('rn|Turn=2\n')
+            assert await _read_log(log_state) == 'EndTurn|Turn=2\n'
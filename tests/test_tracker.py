@@ -0,0 +1,97 @@
+import json
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from snap_tracker._tracker import (
+    GameStateFile,
+    Tracker,
+)
+
+
+def _write_game_state(path, state, **extra):
+    path.write_text(json.dumps({'RemoteGame': {'GameState': state, **extra}}))
+
+
+class TrackerTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = pathlib.Path(self._tmp.name)
+        self.tracker = Tracker()
+        self.tracker.cache_dir = tmp / 'cache'
+        self.tracker.cache_dir.mkdir()
+        self.tracker.game_state = GameStateFile(tmp / 'GameState.json')
+        self.tracker.state_dir = tmp
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+
+class SnapshotTest(TrackerTestCase):
+    def _snapshots(self):
+        return list(self.tracker.cache_dir.glob('game_state_*.json'))
+
+    async def test_same_state_is_saved_once(self):
+        _write_game_state(self.tracker.game_state.path, {'Id': 'abc', 'Turn': 1})
+        state = await self.tracker.parse_game_state()
+        await self.tracker._save_state_snapshot(state)
+        await self.tracker._save_state_snapshot(state)
+        # An equal state that wasn't parsed from the file is compared the same way.
+        await self.tracker._save_state_snapshot(dict(state))
+        assert len(self._snapshots()) == 1
+
+    async def test_changes_outside_the_game_state_are_ignored(self):
+        _write_game_state(self.tracker.game_state.path, {'Id': 'abc', 'Turn': 1})
+        await self.tracker._save_state_snapshot(await self.tracker.parse_game_state())
+        _write_game_state(self.tracker.game_state.path, {'Id': 'abc', 'Turn': 1}, Sequence=2)
+        await self.tracker._save_state_snapshot(await self.tracker.parse_game_state())
+        assert len(self._snapshots()) == 1
+        _write_game_state(self.tracker.game_state.path, {'Id': 'abc', 'Turn': 2})
+        await self.tracker._save_state_snapshot(await self.tracker.parse_game_state())
+        assert len(self._snapshots()) == 2
+
+
+class HandleLogTest(TrackerTestCase):
+    async def test_game_end_stops_processing(self):
+        _write_game_state(self.tracker.game_state.path, {'Id': 'abc', 'Turn': 1})
+        first, second = '60c106af-c97f-445b-8840-d6433be947f9', '70c106af-c97f-445b-8840-d6433be947f9'
+        await self.tracker._handle_log(
+            f'OnMatchmakingMatchFound|GameId={first}\n'
+            'RemoteGame|SendRequestObject|RequestType=CubeGame.AckGameResultRequest\n'
+            f'OnMatchmakingMatchFound|GameId={second}\n',
+        )
+        assert self.tracker.ongoing_game == first
+
+
+class LoadStateTest(TrackerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.profile = self.tracker.state_dir / 'ProfileState.json'
+        self.profile.write_text(json.dumps({'ServerState': {'Account': {'CardStats': {}}}}))
+        collection = self.tracker.state_dir / 'CollectionState.json'
+        collection.write_text(json.dumps({'ServerState': {'CardDefStats': {'Stats': {}}, 'Cards': []}}))
+
+    def _touch(self, path):
+        # Bump the mtime explicitly, file system timestamps can be too coarse to see a rewrite.
+        mtime = path.stat().st_mtime_ns + 1_000_000_000
+        os.utime(path, ns=(mtime, mtime))
+
+    async def test_reload_on_mtime_change(self):
+        with mock.patch.object(self.tracker, '_read_state', wraps=self.tracker._read_state) as read_state:
+            await self.tracker._load_collection()
+            await self.tracker._load_collection()
+            assert [c.args for c in read_state.call_args_list] == [('Profile',), ('Collection',)]
+            collection = self.tracker.collection
+
+            read_state.reset_mock()
+            self._touch(self.profile)
+            await self.tracker._load_collection()
+            # Card scores come from the profile, so the collection is rebuilt as well.
+            assert [c.args for c in read_state.call_args_list] == [('Profile',), ('Collection',)]
+            assert self.tracker.collection is not collection
+
+
+if __name__ == '__main__':
+    unittest.main()
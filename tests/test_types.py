@@ -1,7 +1,13 @@
 import unittest
 import uuid
 
-from snap_tracker.data_types import Game
+from snap_tracker.data_types import (
+    Card,
+    CardVariant,
+    Finish,
+    Game,
+    Rarity,
+)
 
 
 class TypesTest(unittest.TestCase):
@@ -17,6 +23,23 @@ class TypesTest(unittest.TestCase):
             assert waiting_game != new_game
             assert waiting_game != random_id
 
+    def test_card_variants(self):
+        card = Card('Hulk', boosters=10, variants={CardVariant('Default', Rarity.COMMON)})
+        assert card.number_of_common_variants == 1
+        assert not card.has_gold and not card.has_ink
+        card.add_variant(CardVariant('Hulk_01', Rarity.COMMON, finish=Finish.INK))
+        with self.subTest('duplicates are ignored'):
+            card.add_variant(CardVariant('Hulk_01', Rarity.COMMON, finish=Finish.INK))
+            assert len(card.variants) == 2
+        # Adding through the set keeps the summaries up to date as well.
+        card.variants.add(CardVariant('Hulk_01', Rarity.RARE, finish=Finish.GOLD))
+        assert len(card.variants) == 3
+        assert card.different_variants == 2
+        assert card.number_of_common_variants == 2
+        assert card.has_ink
+        assert card.has_gold
+        assert card.rarities == {Rarity.COMMON, Rarity.RARE}
+
 
 if __name__ == '__main__':
     unittest.main()